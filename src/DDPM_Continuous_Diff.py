@@ -39,26 +39,6 @@ class DDPM_Continuous_Diff:
     def marginal_b_t(self, t):
         return t*self.beta_start + (1/2)*(t**2)*(self.beta_end-self.beta_start)
 
-    def igso3_sample(self, shape, device):
-        """
-        Sample from IGSO(3), which we'll assume to be random rotation vectors in 3D space.
-        
-        Args:
-            shape (torch.Size): Desired output shape, must include 3 as the last dimension.
-            device (torch.device): The device to create the tensor on.
-        
-        Returns:
-            torch.Tensor: Sampled rotation vectors with shape [..., 3].
-        """
-        # Sample random unit vectors in 3D space (can be viewed as sampling rotation axes)
-        random_angles = torch.rand(*shape[:-1], 1, device=device) * 2 * math.pi  # Random angles between 0 and 2pi
-        random_axis = torch.randn(*shape[:-1], 3, device=device)  # Random vectors in 3D
-        random_axis = random_axis / torch.norm(random_axis, dim=-1, keepdim=True)  # Normalize to get unit vectors
-        
-        # Rotation vector is axis * angle (using random_angle as the angle for each axis)
-        rotation_vectors = random_axis * random_angles  # Shape: [..., 3]
-        return rotation_vectors
-
     def calc_trans_0(self, score_t, x_t, t, use_torch=True):
         beta_t = self.marginal_b_t(t)
         beta_t = beta_t[..., None, None]
@@ -91,8 +71,10 @@ class DDPM_Continuous_Diff:
         # Sample noise for x1 from normal distribution
         epsilon1 = torch.randn_like(x1)
 
-        # Sample noise for x2 from IGSO(3)
-        epsilon2 = self.igso3_sample(x2.shape, x2.device)
+        # Sample rotation noise as a Gaussian in the tangent space (the
+        # old igso3_sample drew uniform angles, which is not the IGSO(3)
+        # heat-kernel distribution)
+        epsilon2 = torch.randn(*x2.shape[:-2], 3, device=x2.device)
 
         # print(x1.shape, t.shape)
         x1_t = torch.exp(-1/2*self.marginal_b_t(t)) * x1 + \
@@ -156,7 +138,7 @@ class DDPM_Continuous_Diff:
 
             # Initialize both x1 and x2 with random noise
             x1_t = torch.randn(*shape, device=device) if trans_init is None else trans_init  # Random noise for x1 (from normal distribution)
-            x2_t = self.igso3_sample(shape, device)  # Random noise for x2 (from IGSO(3))
+            x2_t = torch.randn(*shape, device=device)  # Random tangent noise for x2
             x2_t = rotvec_to_matrix(x2_t)
             x2_t = x2_t.reshape(B, L, 9)
 
@@ -202,7 +184,7 @@ class DDPM_Continuous_Diff:
             all_se3_images = []      # To store all SE(3) trajectory plots across epochs
             sample_shape = (1, self.seq_len, 3)
             sample_noise_t = torch.randn(*sample_shape, device=device)
-            sample_noise_r = self.igso3_sample(sample_shape, device)
+            sample_noise_r = torch.randn(*sample_shape, device=device)
         
         generate_loop = epochs // 5
         for epoch in range(epochs):
@@ -1,3 +1,5 @@
+import math
+
 import torch
 import numpy as np
 from scipy.spatial.transform import Rotation as R
@@ -72,32 +74,52 @@ def extract(a, t, x_shape):
     out = a.gather(-1, t)
     return out.reshape(b, *((1,) * (len(x_shape) - 1)))
 
-def cosine_schedule(timesteps, s=0.008):
+def cosine_schedule(timesteps, s=0.008, device=None, dtype=torch.float32):
     """
     Defines the cosine schedule for the diffusion process
     Args:
         timesteps: The number of timesteps.
         s: The strength of the schedule.
+        device: The device to build the schedule on.
+        dtype: The dtype of the schedule.
     Returns:
         The computed alpha.
     """
     steps = timesteps + 1
-    x = torch.linspace(0, steps, steps)
+    x = torch.linspace(0, steps, steps, device=device, dtype=dtype)
     alphas_cumprod = torch.cos(((x / steps) + s) / (1 + s) * torch.pi * 0.5) ** 2
     alphas_cumprod = alphas_cumprod / alphas_cumprod[0]
     alphas = alphas_cumprod[1:] / alphas_cumprod[:-1]
     return torch.clip(alphas, 0.001, 1)
 
+@torch.compile(dynamic=False, fullgraph=True, mode="reduce-overhead")
 def skew_symmetric(v):
     """Construct the skew-symmetric matrix S(v) from a vector v = (x,y,z)."""
-    x, y, z = v[..., 0], v[..., 1], v[..., 2]
-    zero = torch.zeros_like(x)
-    return torch.stack([
-        torch.stack([zero, -z, y], dim=-1),
-        torch.stack([z, zero, -x], dim=-1),
-        torch.stack([-y, x, zero], dim=-1)
-    ], dim=-2)
+    x, y, z = v.unbind(-1)
+    # Fill a preallocated zero buffer instead of stacking 9 small tensors;
+    # one allocation + 6 copies rather than 11 kernel launches per call
+    V = v.new_zeros(v.shape[:-1] + (3, 3))
+    V[..., 0, 1] = -z
+    V[..., 0, 2] = y
+    V[..., 1, 0] = z
+    V[..., 1, 2] = -x
+    V[..., 2, 0] = -y
+    V[..., 2, 1] = x
+    return V
+
+# Identity matrices cached per device/dtype so so3_exp_map doesn't reallocate
+# one on every call; broadcasting covers the batch dims, no expand needed
+_eye3_cache = {}
 
+def _eye3(device, dtype):
+    key = (device, dtype)
+    I = _eye3_cache.get(key)
+    if I is None:
+        I = torch.eye(3, device=device, dtype=dtype)
+        _eye3_cache[key] = I
+    return I
+
+@torch.compile(dynamic=False, fullgraph=True, mode="reduce-overhead")
 def so3_exp_map(v):
     """
     Exponential map from so(3) to SO(3).
@@ -106,19 +128,23 @@ def so3_exp_map(v):
     Returns: (..., 3, 3) batch of rotation matrices in SO(3).
     """
     theta = torch.norm(v, dim=-1, keepdim=True)
-    theta_clamped = theta.clamp(min=1e-8)
     V = skew_symmetric(v)  # (B,L,3,3)
-    B, L = v.shape[0], v.shape[1]
-    I = torch.eye(3, device=v.device).expand(B,L,3,3)
+    I = _eye3(v.device, v.dtype)
     sin_theta = torch.sin(theta)
     cos_theta = torch.cos(theta)
-    sin_div = (sin_theta / theta_clamped).unsqueeze(-1)
-    term2 = sin_div * V
-    one_minus_cos_div = ((1 - cos_theta) / (theta_clamped**2)).unsqueeze(-1)
-    term3 = one_minus_cos_div * (V @ V)
-    R = I + term2 + term3
+    theta_sq = theta * theta
+    # Rodrigues with V@V expanded to the outer product vv^T - theta^2 I:
+    #   R = cos(theta) I + (sin(theta)/theta) V + ((1-cos(theta))/theta^2) vv^T
+    # which trades the batched 3x3 matmul for a rank-1 outer product. The
+    # Taylor branches keep the ratios exact as theta -> 0 instead of clamping.
+    small = theta < 1e-3
+    sin_div = torch.where(small, 1 - theta_sq / 6, sin_theta / theta.clamp(min=1e-8))
+    one_minus_cos_div = torch.where(small, 0.5 - theta_sq / 24, (1 - cos_theta) / theta_sq.clamp(min=1e-16))
+    vvT = v.unsqueeze(-1) * v.unsqueeze(-2)
+    R = cos_theta.unsqueeze(-1) * I + sin_div.unsqueeze(-1) * V + one_minus_cos_div.unsqueeze(-1) * vvT
     return R
 
+@torch.compile(dynamic=False, fullgraph=True, mode="reduce-overhead")
 def so3_log_map(R):
     """
     Logarithm map from SO(3) to so(3).
@@ -126,24 +152,87 @@ def so3_log_map(R):
     R: (..., 3, 3) batch of rotation matrices in SO(3).
     Returns: (..., 3) batch of tangent vectors.
     """
+    # omega = unskewed antisymmetric part, with ||omega|| = 2 sin(theta) and
+    # trace(R) - 1 = 2 cos(theta), so atan2 recovers the angle without the
+    # acos clamp; sinc folds the theta/sin(theta) rescale and its theta -> 0
+    # limit into one stable op
+    omega = torch.stack([
+        R[...,2,1] - R[...,1,2],
+        R[...,0,2] - R[...,2,0],
+        R[...,1,0] - R[...,0,1]
+    ], dim=-1)  # (B,L,3)
+    norms = omega.norm(dim=-1, keepdim=True)
     trace_R = R[...,0,0] + R[...,1,1] + R[...,2,2]
-    cos_theta = (trace_R - 1.) / 2.
-    cos_theta = cos_theta.clamp(-1+1e-7, 1-1e-7)
-    theta = torch.acos(cos_theta)
-    theta_clamped = theta.clamp(min=1e-8)
-
-    R_T = R.transpose(-1,-2)
-    Q = (R - R_T) / 2.0
-    x = (Q[...,2,1] - Q[...,1,2]) / 2
-    y = (Q[...,0,2] - Q[...,2,0]) / 2
-    z = (Q[...,1,0] - Q[...,0,1]) / 2
-    v = torch.stack([x, y, z], dim=-1)  # (B,L,3)
-
-    sin_theta = torch.sin(theta_clamped)
-    scale = (theta / sin_theta).unsqueeze(-1)
-    v = v * scale
+    theta = torch.atan2(norms, (trace_R - 1.).unsqueeze(-1))
+    v = 0.5 * omega / torch.sinc(theta / math.pi)
     return v
 
+@torch.compile(dynamic=False, fullgraph=True, mode="reduce-overhead")
+def quat_exp(v):
+    """
+    Exponential map from so(3) to unit quaternions (w, x, y, z).
+
+    v: (..., 3) batch of vectors in R^3 (tangent space).
+    Returns: (..., 4) batch of unit quaternions.
+    """
+    theta = torch.norm(v, dim=-1, keepdim=True)
+    half = 0.5 * theta
+    # sin(theta/2)/theta with its Taylor limit, mirroring so3_exp_map
+    small = theta < 1e-3
+    sin_div = torch.where(small, 0.5 - theta * theta / 48, torch.sin(half) / theta.clamp(min=1e-8))
+    return torch.cat([torch.cos(half), sin_div * v], dim=-1)
+
+@torch.compile(dynamic=False, fullgraph=True, mode="reduce-overhead")
+def quat_log(q):
+    """
+    Logarithm map from unit quaternions to so(3).
+
+    q: (..., 4) batch of unit quaternions (w, x, y, z).
+    Returns: (..., 3) batch of tangent vectors with norm in [0, pi].
+    """
+    # Canonicalize to the w >= 0 hemisphere so the angle lands in [0, pi],
+    # matching so3_log_map's range
+    q = torch.where(q[..., :1] < 0, -q, q)
+    w, xyz = q[..., :1], q[..., 1:]
+    norm = xyz.norm(dim=-1, keepdim=True)
+    # 2*atan2(||xyz||, w)/||xyz|| -> 2/w as ||xyz|| -> 0
+    scale = torch.where(norm < 1e-6, 2.0 / w.clamp(min=1e-8),
+                        2.0 * torch.atan2(norm, w) / norm.clamp(min=1e-8))
+    return scale * xyz
+
+@torch.compile(dynamic=False, fullgraph=True, mode="reduce-overhead")
+def quat_mul(q1, q2):
+    """Hamilton product of two batches of quaternions (w, x, y, z)."""
+    w1, x1, y1, z1 = q1.unbind(-1)
+    w2, x2, y2, z2 = q2.unbind(-1)
+    return torch.stack([
+        w1*w2 - x1*x2 - y1*y2 - z1*z2,
+        w1*x2 + x1*w2 + y1*z2 - z1*y2,
+        w1*y2 - x1*z2 + y1*w2 + z1*x2,
+        w1*z2 + x1*y2 - y1*x2 + z1*w2
+    ], dim=-1)
+
+@torch.compile(dynamic=False, fullgraph=True, mode="reduce-overhead")
+def quat_to_matrix(q):
+    """
+    Convert unit quaternions (w, x, y, z) to rotation matrices.
+
+    q: (..., 4) batch of unit quaternions.
+    Returns: (..., 3, 3) batch of rotation matrices.
+    """
+    w, x, y, z = q.unbind(-1)
+    R = q.new_empty(q.shape[:-1] + (3, 3))
+    R[..., 0, 0] = 1 - 2*(y*y + z*z)
+    R[..., 0, 1] = 2*(x*y - w*z)
+    R[..., 0, 2] = 2*(x*z + w*y)
+    R[..., 1, 0] = 2*(x*y + w*z)
+    R[..., 1, 1] = 1 - 2*(x*x + z*z)
+    R[..., 1, 2] = 2*(y*z - w*x)
+    R[..., 2, 0] = 2*(x*z - w*y)
+    R[..., 2, 1] = 2*(y*z + w*x)
+    R[..., 2, 2] = 1 - 2*(x*x + y*y)
+    return R
+
 def so3_interpolate(x, y, gamma):
     """
     Geodesic interpolation on SO(3): 
@@ -159,6 +248,7 @@ def so3_interpolate(x, y, gamma):
     new_v = gamma * v
     return so3_exp_map(new_v)
 
+@torch.compile(dynamic=False, fullgraph=True, mode="reduce-overhead")
 def rotation_distance_loss(R_pred, R_true):
     """
     Compute the rotation distance loss between two batches of rotation matrices.
@@ -170,9 +260,9 @@ def rotation_distance_loss(R_pred, R_true):
     Returns:
         Loss value (mean rotation distance in radians).
     """
-    Rt = R_pred.transpose(-1,-2)
-    M = Rt @ R_true
-    trace_val = M[...,0,0] + M[...,1,1] + M[...,2,2]
+    # trace(R_pred^T R_true) = <R_pred, R_true>_F, so the elementwise product
+    # replaces the batched 3x3 matmul
+    trace_val = (R_pred * R_true).sum(dim=(-1, -2))
     # Clip for numerical stability
     cos_theta = (trace_val - 1.0)/2.0
     cos_theta = cos_theta.clamp(-1+1e-7, 1-1e-7)